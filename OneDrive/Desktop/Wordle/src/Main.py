@@ -1,13 +1,12 @@
+import ast
 import os
-import re
 import subprocess
 import sys
-import pkg_resources
-import importlib
+from importlib.metadata import distributions
 
 # List of standard library modules (these don't need to be installed)
 STANDARD_LIBRARIES = {
-    'os', 'sys', 'collections'
+    'os', 'sys', 'collections', 'pickle', 'logging', 'itertools', 'hashlib'
 }
 
 def list_versions(filename_prefix):
@@ -17,31 +16,40 @@ def list_versions(filename_prefix):
 
 def check_and_install_dependencies(requirements):
     """Check and install missing dependencies."""
+    # Read the names of the installed distributions once instead of scanning them for every requirement
+    installed = {dist.metadata['Name'].lower() for dist in distributions() if dist.metadata['Name']}
     for requirement in requirements:
         # Skip installing standard libraries
         if requirement in STANDARD_LIBRARIES:
             print(f"Skipping standard library: {requirement}")
             continue
 
-        try:
-            # Only install the package if it's a valid requirement string
-            pkg_resources.require(requirement)
-        except pkg_resources.DistributionNotFound:
+        if requirement.lower() not in installed:
             print(f"Installing missing dependency: {requirement}")
             subprocess.check_call([sys.executable, '-m', 'pip', 'install', requirement])
 
 def extract_imports(filepath):
     """Extract package names from import statements."""
-    packages = []
     with open(filepath, 'r', encoding='utf-8') as f:  # Specify 'utf-8' encoding
-        for line in f:
-            match = re.match(r'^(?:import|from)\s+([a-zA-Z0-9_]+)', line)
-            if match:
-                package = match.group(1)
-                # Add the package to the list if it's a valid package
-                if package not in packages:
-                    packages.append(package)
-    return packages
+        tree = ast.parse(f.read(), filename=filepath)
+
+    packages = set()
+    for node in ast.walk(tree):  # Also finds indented and conditional imports
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+
+        for name in names:
+            package = name.split('.')[0]
+            # Local modules such as engine.py are not installed, their imports are collected instead
+            if os.path.exists(f"{package}.py"):
+                packages.update(extract_imports(f"{package}.py"))
+            else:
+                packages.add(package)
+    return sorted(packages)
 
 
 def main():
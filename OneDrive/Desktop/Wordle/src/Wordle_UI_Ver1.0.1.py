@@ -1,15 +1,15 @@
 import sys # System-specific parameters and functions
 import os # Operating system Library
+import logging # Debug output, off unless a handler is configured
 import numpy as np # Numerical computing library
-from collections import  Counter # Counter is a dict subclass for counting hashable objects
 
 # User Interface Libraries
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget, 
     QLabel, QPushButton, QHBoxLayout, QGridLayout, QFrame, QSplitter, QSizePolicy)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont, QKeyEvent
 
-import pandas as pd # Data manipulation library
+from engine import load_game_data, best_guesses, filter_possible # Shared pattern and entropy engine
 
 # Gets the resource path for the file when exporting
 def get_resource_path(relative_path):
@@ -22,9 +22,9 @@ def get_resource_path(relative_path):
 # Constants
 N_GUESSES = 6 # The number of guesses in a wordle game
 DICT_FILE = 'words.parquet' # The file containing a dictionary of all correct words in wordle
-DICT_FILE_ALL = 'all_words.parquet' # The file containing a dictionary of all words in wordle
 CACHE_DIR = get_resource_path("cache2") # Path to the cache directory
-WORD_LEN = 5 # Length of a word guess in wordle
+
+logger = logging.getLogger(__name__)
 
 """
 The Wordle Button class is a custom QPushButton representation that denotes a grid in a wordle game.
@@ -99,8 +99,9 @@ class MainWindow(QMainWindow):
 
         # Initialize game data
         self.word_list = [] # List of all words in the wordle game
-        self.pattern_cache = {} # Cache for storing the pattern of a word
-        self.all_words = set() # Set of all words in the wordle game
+        self.word_to_id = {} # Maps each word to its row in the pattern matrix
+        self.PAT = None # Pattern code for every guess and answer pair
+        self.possible_mask = None # True for each word that is still a possible answer
         self.load_game_data() # load the game data using the files in our constants
         
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
@@ -108,73 +109,10 @@ class MainWindow(QMainWindow):
 
     # Loads our game data from the files
     def load_game_data(self):
-        """Load word list and initialize pattern cache"""
-        os.makedirs(CACHE_DIR, exist_ok=True) # Create the cache directory if it does not exist
-        
-        FILE_LOC_ALL = os.path.join(CACHE_DIR, DICT_FILE_ALL) # File location for the all words dictionary
-
-        if os.path.exists(FILE_LOC_ALL): # If the file exists
-            df = pd.read_parquet(FILE_LOC_ALL) # Read the parquet file
-        else: # If the file does not exist
-            print("Parquet file not found. Generating from text file...") 
-            with open(DICT_FILE_ALL, 'r') as f: # Generate the parquet file from the text file
-                words = [line.strip() for line in f.readlines()]
-            df = pd.DataFrame({"Word": words})
-            df.to_parquet(FILE_LOC_ALL)
-
-        self.word_list = df['Word'].tolist() # Get the list of words from the data frame
-        self.all_words = set(self.word_list) # Set the all words set to the word list
-        print(f'Loaded dictionary with {len(self.word_list)} words...') # Print the number of words loaded
-
-    def calculate_pattern(self, guess, answer):
-        """Optimized pattern calculation"""
-        if (guess, answer) in self.pattern_cache: # If the pattern is in the cache, return the pattern
-            return self.pattern_cache[(guess, answer)]
-        
-        print(f"Calculating pattern for guess: {guess}, answer: {answer}")
-        pattern = [0] * WORD_LEN # Initialize the pattern to 0s
-        guess_chars = list(guess) # Convert the guess to a list of characters
-        answer_chars = list(answer) # Convert the answer to a list of characters
-        
-        # Mark correct positions
-        for i in range(WORD_LEN):
-            if guess_chars[i] == answer_chars[i]:
-                pattern[i] = 2
-                guess_chars[i] = answer_chars[i] = None
-        
-        # Mark present positions
-        remaining_answer = Counter(c for c in answer_chars if c is not None)
-        for i in range(WORD_LEN):
-            if guess_chars[i] is not None and remaining_answer[guess_chars[i]] > 0:
-                pattern[i] = 1
-                remaining_answer[guess_chars[i]] -= 1
-        
-        result = tuple(pattern)
-        self.pattern_cache[(guess, answer)] = result
-        print(f"Pattern for {guess} vs {answer}: {result}")
-        return result
-
-
-    def calculate_entropy(self, guess, possible_words):
-        """Calculate entropy for a guess"""
-        print(f"Calculating entropy for guess: {guess}")
-        pattern_counts = Counter() # Counter for the pattern counts i.e. how many patterns are in the pattern_counts dictionary
-        for answer in possible_words: # For each answer in possible words
-            pattern = self.calculate_pattern(guess, answer) # Calculate the pattern for the answer and the guess
-            pattern_counts[pattern] += 1 # Increment the pattern count for the pattern
-            if len(pattern_counts) % 100 == 0:  # Log progress every 100 words
-                print(f"Processed {len(pattern_counts)} patterns for {guess}...")
-        
-        total = len(possible_words) # Total number of possible words
-        entropy = 0 # Initialize entropy to 0
-        for count in pattern_counts.values(): # for each count in the pattern counts
-            prob = count / total # Calculate the probability of the pattern (count / total)
-            entropy -= prob * np.log2(prob) # E = -Σ p(x) * log2(p(x))
-        
-        print(f"Entropy for {guess}: {entropy:.2f}")
-        return entropy
+        """Load word list and the pattern matrix"""
+        self.word_list, self.word_to_id, self.PAT = load_game_data(CACHE_DIR)
+        self.possible_mask = np.ones(len(self.word_list), dtype=bool) # Every word is possible before the first guess
 
-    
     def init_ui(self):
         # Create main widget and layout
         main_widget = QWidget()
@@ -283,72 +221,51 @@ class MainWindow(QMainWindow):
 
     def update_suggestions(self):
         """Update suggestions based on current possible words"""
-        print("Updating suggestions...")
-        if not self.all_words:
-            self.all_words = set(self.word_list)
+        logger.debug("Updating suggestions...")
         
         # Only use precomputed best words for the first guess
         if self.current_row == 0:
-            print("Using precomputed best words for the first guess.")
+            logger.debug("Using precomputed best words for the first guess.")
             top_words = [("TARES", 4.29), ("LARES", 4.26), ("RALES", 4.24),
                         ("RATES", 4.23), ("TERAS", 4.21)]
         else:
             # After the first guess, calculate entropy for remaining words
-            print(f"Calculating suggestions from {len(self.all_words)} possible words...")
-            if len(self.all_words) <= 100:
-                candidates = list(self.all_words)
-            else:
-                print("Sampling from word list...")
-                sample_size = min(100, len(self.all_words))
-                possible_sample = np.random.choice(list(self.all_words), 
-                                                size=sample_size // 2, 
-                                                replace=False)
-                full_sample = np.random.choice(self.word_list, 
-                                            size=sample_size // 2, 
-                                            replace=False)
-                candidates = list(set(possible_sample) | set(full_sample))
-            
-            print(f"Calculating entropy for {len(candidates)} candidates...")
-            entropies = {}
-            for word in candidates:
-                entropies[word] = self.calculate_entropy(word, self.all_words)
-                print(f"Entropy calculated for {word}: {entropies[word]:.2f} bits")
-            top_words = sorted(entropies.items(), key=lambda x: x[1], reverse=True)[:5]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Calculating suggestions from %d possible words...", np.count_nonzero(self.possible_mask))
+            top_words = [(self.word_list[i], entropy_val) for i, entropy_val in best_guesses(self.PAT, self.possible_mask)]
     
         # Update the labels
+        for label in self.suggestions_labels:
+            label.setText("")
+        if not top_words: # The patterns entered ruled out every word
+            self.suggestions_labels[0].setText("No words match")
         for i, (word, entropy_val) in enumerate(top_words):
-            print(f"Suggestion {i+1}: {word.upper()} ({entropy_val:.2f} bits)")
+            logger.debug("Suggestion %d: %s (%.2f bits)", i + 1, word.upper(), entropy_val)
             self.suggestions_labels[i].setText(f"{word.upper()}: {entropy_val:.2f} bits")
 
     def handle_enter(self):
-        if self.current_col == 5 and self.current_word.lower() in self.word_list:
+        if self.current_col == 5 and self.current_word.lower() in self.word_to_id:
             # Get pattern from user-selected button states
-            pattern = []
+            pattern = ""
             for btn in self.grid_buttons[self.current_row]:
                 state = btn.getState()
                 if state == "correct":
-                    pattern.append(2)
+                    pattern += "2"
                 elif state == "present":
-                    pattern.append(1)
+                    pattern += "1"
                 else:  # "absent" or "empty"
-                    pattern.append(0)
-            
-            print(f"Observed pattern for {self.current_word}: {pattern}")
-
-            # Find words consistent with the pattern
-            filtered_words = {
-                possible_word
-                for possible_word in self.all_words
-                if self.calculate_pattern(self.current_word.lower(), possible_word) == tuple(pattern)
-            }
+                    pattern += "0"
             
-            # Intersect with the current set of possible words
-            self.all_words &= filtered_words  # Intersect with the current possible words
-            print(f"Filtered possible words: {len(self.all_words)} remaining.")
+            logger.debug("Observed pattern for %s: %s", self.current_word, pattern)
+
+            # Keep only the words consistent with the pattern
+            filter_possible(self.PAT, self.possible_mask, self.word_to_id[self.current_word.lower()], pattern)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Filtered possible words: %d remaining.", np.count_nonzero(self.possible_mask))
 
             # Update suggestions
             self.current_row += 1
-            self.update_suggestions()
+            QTimer.singleShot(0, self.update_suggestions) # Run after this event so the grid repaints first
             self.update()  # This forces a refresh of the UI.
 
             
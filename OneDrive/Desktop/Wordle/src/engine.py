@@ -0,0 +1,267 @@
+# Shared game engine for the command line and UI versions of the assistant
+# Holds the pattern matrix builder, the entropy calculation and the filtering of possible words
+import sys # System-specific parameters and functions
+import os # Operating system Library
+import itertools # Iteration tools for enumerating the patterns
+import hashlib # Hashing for fingerprinting the dictionary file
+import pickle # Object serialization library
+import numpy as np # Numerical computing library
+from numba import njit, prange # Just-in-time compiler for the pattern and entropy calculations
+import pyarrow as pa # Columnar data library
+import pyarrow.parquet as pq # Parquet file reading and writing
+
+# Constants
+DICT_FILE_ALL = 'all_words.parquet' # The file containing a dictionary of all words in wordle
+WORDS_CACHE_FILE = 'words.npy' # The cached (N, 5) array of word letters
+ID_MAP_CACHE_FILE = 'word_to_id.pkl' # The cached map from each word to its id, with the fingerprint of the dictionary it came from
+PAT_CACHE_FILE = 'pat.npy' # The cached pattern matrix, built by tools/build_pat.py or on the first run
+PAT_KEY_FILE = 'pat.key' # Fingerprint of the dictionary the cached pattern matrix was built from
+TOP_GUESSES_CACHE_FILE = 'top5.pkl' # The cached best guesses for small sets of possible words, with the same fingerprint
+WORD_LEN = 5 # Length of a word guess in wordle
+N_PATTERNS = 3 ** WORD_LEN # Number of possible patterns for a guess
+LANE_ONES = 0x0101010101 # A 1 in each of the five letter lanes of a packed word
+LANE_LOW_BITS = 0x7F7F7F7F7F # The low 7 bits of each letter lane
+SMALL_SET_SIZE = 64 # Largest set of possible words whose best guesses are cached
+TOP_GUESSES_MAX = 100_000 # Most cached best guesses kept, the oldest are dropped first
+N_SUGGESTIONS = 5 # Number of best guesses to suggest
+JIT_CACHE = not getattr(sys, 'frozen', False) # Numba can only cache kernels next to a .py source, which a PyInstaller bundle lacks
+
+# Base-3 code of every pattern string of 0s, 1s and 2s, e.g. "20110"
+# product() counts up in base 3 with the first letter most significant, so each pattern's index is its code
+PATTERN_STR_TO_CODE = {''.join(map(str, digits)): code for code, digits in enumerate(itertools.product(range(3), repeat=WORD_LEN))}
+
+top_guess_cache = {} # Best guesses keyed by the sorted tuple of possible word ids, shared between sessions
+top_guess_file = None # Where the best guesses are saved, set when the game data is loaded
+top_guess_fingerprint = None # Fingerprint of the dictionary the best guesses belong to
+
+# Fingerprints the dictionary file so caches built from an older copy are rebuilt
+def dictionary_fingerprint(path):
+    """Return the sha1 hex digest of the dictionary file"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+# Loads the words from the files
+def load_words(cache_dir):
+    """Load the word list, word to id map, (N, 5) letter array and dictionary fingerprint from the cache directory"""
+    os.makedirs(cache_dir, exist_ok=True) # Create the cache directory if it does not exist
+
+    FILE_LOC_ALL = os.path.join(cache_dir, DICT_FILE_ALL) # File location for the all words dictionary
+    FILE_LOC_WORDS = os.path.join(cache_dir, WORDS_CACHE_FILE) # File location for the cached letter array
+    FILE_LOC_IDS = os.path.join(cache_dir, ID_MAP_CACHE_FILE) # File location for the cached word to id map
+
+    if not os.path.exists(FILE_LOC_ALL): # If the file does not exist
+        print("Parquet file not found. Generating from text file...") 
+        with open(DICT_FILE_ALL, 'r') as f: # Generate the parquet file from the text file
+            words = [line.strip() for line in f.readlines()]
+        pq.write_table(pa.table({"Word": words}), FILE_LOC_ALL)
+    fingerprint = dictionary_fingerprint(FILE_LOC_ALL)
+
+    cached = None
+    if os.path.exists(FILE_LOC_WORDS) and os.path.exists(FILE_LOC_IDS): # If the cached words exist
+        try:
+            with open(FILE_LOC_IDS, 'rb') as f:
+                cached = pickle.load(f)
+        except (EOFError, pickle.UnpicklingError): # A half written cache is rebuilt
+            cached = None
+
+    if isinstance(cached, dict) and cached.get('fingerprint') == fingerprint: # Only trust caches of this dictionary
+        W = np.load(FILE_LOC_WORDS, mmap_mode='r') # Memory map the (N, 5) array of letters
+        word_to_id = cached['word_to_id']
+        word_list = list(word_to_id) # The map is ordered by id
+    else:
+        word_list = pq.read_table(FILE_LOC_ALL, columns=['Word']).column('Word').to_pylist() # Read the word column of the parquet file
+        W = np.frombuffer(''.join(word_list).encode('ascii'), dtype=np.uint8).reshape(-1, WORD_LEN) # (N, 5) array of letters
+        word_to_id = {word: i for i, word in enumerate(word_list)} # Maps each word to its row in the pattern matrix
+        np.save(FILE_LOC_WORDS, W) # Cache both so later starts skip the parquet
+        with open(FILE_LOC_IDS, 'wb') as f:
+            pickle.dump({'fingerprint': fingerprint, 'word_to_id': word_to_id}, f)
+
+    print(f'Loaded dictionary with {len(word_list)} words...') # Print the number of words loaded
+    return word_list, word_to_id, W, fingerprint
+
+# Saves the pattern matrix keyed to the dictionary it was built from
+def save_pattern_matrix(cache_dir, PAT, fingerprint):
+    """Write pat.npy and its fingerprint, dropping best guesses made with an older matrix"""
+    FILE_LOC_PAT = os.path.join(cache_dir, PAT_CACHE_FILE) # File location for the cached pattern matrix
+    FILE_LOC_KEY = os.path.join(cache_dir, PAT_KEY_FILE) # File location for the matrix's fingerprint
+    FILE_LOC_TOP = os.path.join(cache_dir, TOP_GUESSES_CACHE_FILE) # File location for the cached best guesses
+
+    for path in (FILE_LOC_KEY, FILE_LOC_TOP): # Removed first so a half written matrix is never trusted
+        if os.path.exists(path):
+            os.remove(path)
+    np.save(FILE_LOC_PAT, PAT)
+    with open(FILE_LOC_KEY, 'w') as f:
+        f.write(fingerprint)
+
+# Loads our game data from the files
+def load_game_data(cache_dir):
+    """Load the word list, word to id map and pattern matrix from the cache directory"""
+    word_list, word_to_id, W, fingerprint = load_words(cache_dir)
+
+    FILE_LOC_PAT = os.path.join(cache_dir, PAT_CACHE_FILE) # File location for the cached pattern matrix
+    FILE_LOC_KEY = os.path.join(cache_dir, PAT_KEY_FILE) # File location for the matrix's fingerprint
+    PAT = None
+    if os.path.exists(FILE_LOC_PAT) and os.path.exists(FILE_LOC_KEY): # If the cached matrix exists
+        with open(FILE_LOC_KEY, 'r') as f:
+            built_for = f.read()
+        if built_for == fingerprint: # Only trust a matrix built from this dictionary
+            PAT = np.load(FILE_LOC_PAT, mmap_mode='r') # Memory map it instead of reading it into RAM
+            if PAT.shape != (len(word_list), len(word_list)):
+                PAT = None
+
+    if PAT is None:
+        print('Building pattern matrix...')
+        PAT = build_pattern_matrix(W)
+        save_pattern_matrix(cache_dir, PAT, fingerprint)
+
+    global top_guess_file, top_guess_fingerprint
+    top_guess_file = os.path.join(cache_dir, TOP_GUESSES_CACHE_FILE) # File location for the cached best guesses
+    top_guess_fingerprint = fingerprint
+    load_top_guesses()
+    return word_list, word_to_id, PAT
+
+# Loads the cached best guesses, a fingerprint record followed by one record per cached state
+def load_top_guesses():
+    """Fill the best guess cache from top5.pkl, rewriting the file if it is stale, damaged or too big"""
+    top_guess_cache.clear()
+    if not os.path.exists(top_guess_file):
+        save_top_guesses()
+        return
+
+    clean = False
+    size = os.path.getsize(top_guess_file)
+    with open(top_guess_file, 'rb') as f:
+        try:
+            if pickle.load(f) == top_guess_fingerprint: # Guesses made for another dictionary are dropped
+                while f.tell() < size:
+                    poss_key, top = pickle.load(f)
+                    top_guess_cache[poss_key] = top
+                clean = True
+        except (EOFError, pickle.UnpicklingError): # A record cut short by a crash ends the usable part of the file
+            pass
+
+    while len(top_guess_cache) > TOP_GUESSES_MAX: # Dicts keep insertion order so the oldest come first
+        del top_guess_cache[next(iter(top_guess_cache))]
+        clean = False
+    if not clean:
+        save_top_guesses()
+
+# Rewrites the cached best guesses in full
+def save_top_guesses():
+    """Atomically replace top5.pkl with the fingerprint and every cached state"""
+    temp_file = top_guess_file + '.tmp'
+    with open(temp_file, 'wb') as f:
+        pickle.dump(top_guess_fingerprint, f)
+        for record in top_guess_cache.items():
+            pickle.dump(record, f)
+    os.replace(temp_file, top_guess_file) # Readers only ever see the old or the new file
+
+# Calculates the pattern for a guess and answer packed as one letter per byte
+@njit(cache=JIT_CACHE)
+def calculate_pattern(guess, answer, answer_letters):
+    """Branchless pattern calculation, returns the base-3 pattern code"""
+    # Mark correct positions, a lane of guess ^ answer is zero where the letters match
+    x = guess ^ answer
+    zero_lanes = ~(((x & LANE_LOW_BITS) + LANE_LOW_BITS) | x | LANE_LOW_BITS) # High bit set in each zero lane
+    green = 0
+    for i in range(WORD_LEN):
+        green |= ((zero_lanes >> (8 * i + 7)) & 1) << i
+
+    # Mark present positions, each one uses up the leftmost unused answer position holding the letter
+    available = ~green & 0x1F # Answer positions not already matched by a green
+    code = 0
+    for i in range(WORD_LEN):
+        digit = 2
+        if not (green >> i) & 1:
+            digit = 0
+            letter = (guess >> (8 * i)) & 0xFF
+            if (answer_letters >> (letter - ord('a'))) & 1: # Only search the answer if it holds the letter at all
+                y = answer ^ (letter * LANE_ONES) # Zero in lanes holding the guess letter
+                same_lanes = ~(((y & LANE_LOW_BITS) + LANE_LOW_BITS) | y | LANE_LOW_BITS)
+                same = 0
+                for j in range(WORD_LEN):
+                    same |= ((same_lanes >> (8 * j + 7)) & 1) << j
+                same &= available
+                if same:
+                    digit = 1
+                    available ^= same & -same # Use up the leftmost matching position
+        code = code * 3 + digit
+    return code
+
+# Fills the pattern matrix in parallel over the guesses
+@njit(parallel=True, cache=JIT_CACHE)
+def fill_pattern_matrix(packed, letters, PAT):
+    for i in prange(len(packed)):
+        for j in range(len(packed)):
+            if letters[i] & letters[j]:
+                PAT[i, j] = calculate_pattern(packed[i], packed[j], letters[j])
+            else: # No letters in common, every position is absent
+                PAT[i, j] = 0
+
+# Builds the pattern code for every guess and answer pair
+def build_pattern_matrix(W):
+    """Build the (N, N) uint8 matrix of base-3 pattern codes, indexed [guess_id, answer_id]"""
+    n = len(W)
+    packed = (W.astype(np.int64) << (8 * np.arange(WORD_LEN))).sum(axis=1) # One letter per byte, first letter lowest
+
+    # One-hot encode the letters to get the set of letters in each word as a 26 bit mask
+    one_hot = np.zeros((n, WORD_LEN, 26), dtype=np.uint8)
+    one_hot[np.arange(n)[:, None], np.arange(WORD_LEN), W - ord('a')] = 1
+    letters = one_hot.max(axis=1).astype(np.int64) @ (1 << np.arange(26, dtype=np.int64))
+
+    PAT = np.empty((n, n), dtype=np.uint8)
+    fill_pattern_matrix(packed, letters, PAT)
+    return PAT
+
+# Calculate the entropy for every candidate guess at once
+@njit(parallel=True, cache=JIT_CACHE)
+def entropies(PAT, cand_ids, poss_ids):
+    """Calculate entropy for each candidate guess over the possible answers"""
+    out = np.zeros(len(cand_ids)) # Entropy of each candidate
+    total = len(poss_ids) # Total number of possible words
+    if total == 0:
+        return out
+    log_total = np.log2(total)
+    for i in prange(len(cand_ids)): # Candidates are scored in parallel
+        guess_row = PAT[cand_ids[i]] # Patterns of the guess against every answer
+        pattern_counts = np.zeros(N_PATTERNS, np.int32) # How many possible answers give each pattern
+        for j in poss_ids:
+            pattern_counts[guess_row[j]] += 1
+
+        # E = -Σ p(x) * log2(p(x)) = log2(n) - Σ c * log2(c) / n with p(x) = c / n
+        weighted = 0.0
+        for count in pattern_counts:
+            if count > 1: # Counts of 0 and 1 add nothing
+                weighted += count * np.log2(count)
+        out[i] = log_total - weighted / total
+    return out
+
+# Keeps only the possible words that would have given the observed pattern
+def filter_possible(PAT, possible_mask, guess_id, pattern):
+    """Narrow the possible word mask in place and return it"""
+    possible_mask &= PAT[guess_id] == PATTERN_STR_TO_CODE[pattern]
+    return possible_mask
+
+# Finds the best guesses for the remaining possible words
+def best_guesses(PAT, possible_mask):
+    """Return the (id, entropy) of the best guesses, best first, or an empty list if no word is possible"""
+    possible_ids = np.flatnonzero(possible_mask) # Ids of the remaining possible words
+    if len(possible_ids) == 0: # Nothing fits the patterns entered so there is nothing to suggest
+        return []
+    poss_key = tuple(possible_ids.tolist()) if len(possible_ids) <= SMALL_SET_SIZE else None
+    if poss_key in top_guess_cache: # Small states recur when replaying games so their answer is kept
+        return top_guess_cache[poss_key]
+
+    entropy_vals = entropies(PAT, np.arange(PAT.shape[0]), possible_ids) # Score every word in the dictionary
+    # Best entropy first, ties go to words that could still be the answer
+    top_ids = np.lexsort((possible_mask, entropy_vals))[::-1][:N_SUGGESTIONS]
+    top = [(int(i), float(entropy_vals[i])) for i in top_ids]
+
+    if poss_key is not None:
+        top_guess_cache[poss_key] = top
+        if len(top_guess_cache) > TOP_GUESSES_MAX:
+            del top_guess_cache[next(iter(top_guess_cache))] # The file is trimmed to match on the next load
+        if top_guess_file is not None:
+            with open(top_guess_file, 'ab') as f: # Only the new state is written instead of the whole cache
+                pickle.dump((poss_key, top), f)
+    return top
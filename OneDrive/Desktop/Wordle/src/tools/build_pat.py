@@ -0,0 +1,24 @@
+import os
+import sys
+import time
+
+# The engine lives in the folder above this one
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+from engine import load_words, build_pattern_matrix, save_pattern_matrix, PAT_CACHE_FILE
+
+# Builds the pattern matrix once so the assistants can memory map it on start up
+def main():
+    cache_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(SRC_DIR, 'cache2') # Cache directory to read the words from and write to
+    word_list, word_to_id, W, fingerprint = load_words(cache_dir)
+
+    print('Building pattern matrix...')
+    start = time.perf_counter()
+    PAT = build_pattern_matrix(W)
+    print(f'Built {PAT.shape[0]} x {PAT.shape[1]} pattern matrix in {time.perf_counter() - start:.1f}s')
+
+    save_pattern_matrix(cache_dir, PAT, fingerprint) # Also drops best guesses cached for an older matrix
+    print(f'Saved {PAT.nbytes / 1e6:.0f}MB to {os.path.join(cache_dir, PAT_CACHE_FILE)}')
+
+if __name__ == "__main__":
+    main()